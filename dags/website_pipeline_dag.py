@@ -112,8 +112,11 @@ dag = DAG(
 def check_dependencies():
     """Check if required dependencies are available."""
     try:
-        import requests
+        import aiohttp
         import bs4
+        import lxml
+        import ijson
+        import orjson
         print("✅ All required dependencies are available")
         return True
     except ImportError as e:
@@ -154,13 +157,12 @@ def extract_and_tag_task():
         
         # Verify output exists
         from pathlib import Path
-        import json
         
-        extracted_file = Path(__file__).resolve().parent.parent / "data" / "processed" / "extracted.json"
+        extracted_file = Path(__file__).resolve().parent.parent / "data" / "processed" / "extracted.jsonl"
         if extracted_file.exists():
+            # One JSON object per domain per line
             with open(extracted_file, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-            domains_count = len(data.get('domains', {}))
+                domains_count = sum(1 for line in f if line.strip())
             print(f"✅ Extracted text from {domains_count} domains")
         else:
             raise Exception("No extracted data file was generated")
@@ -283,7 +285,7 @@ def validate_pipeline_output():
         # Check all expected output files
         expected_files = [
             base_dir / "data" / "metadata.json",
-            base_dir / "data" / "processed" / "extracted.json",
+            base_dir / "data" / "processed" / "extracted.jsonl",
             base_dir / "data" / "processed" / "standardized.json",
             base_dir / "data" / "aggregated" / "metrics.json"
         ]
@@ -296,6 +298,11 @@ def validate_pipeline_output():
             if file_path.suffix == '.json':
                 with open(file_path, 'r', encoding='utf-8') as f:
                     json.load(f)  # Will raise exception if invalid JSON
+            elif file_path.suffix == '.jsonl':
+                with open(file_path, 'r', encoding='utf-8') as f:
+                    for line in f:
+                        if line.strip():
+                            json.loads(line)  # Will raise exception if invalid JSON
         
         # Check raw data directory
         raw_dir = base_dir / "data" / "raw"
@@ -342,7 +349,7 @@ with dag:
         Extracts clean text from HTML files using intelligent heuristics.
         - Removes scripts, styles, and comments
         - Extracts navbar, homepage, footer, and case study content
-        - Saves to data/processed/extracted.json
+        - Saves to data/processed/extracted.jsonl (one line per domain)
         """,
     )
     
@@ -1,9 +1,10 @@
-import os
-import json
 import logging
 from pathlib import Path
 from datetime import datetime
-from collections import defaultdict, Counter
+from collections import Counter
+import ijson
+import orjson
+from pipeline_utils import setup_logging, JSON_DUMP_OPTIONS, READ_BUFFER_SIZE
 
 # Configuration
 BASE_DIR = Path(__file__).resolve().parent.parent
@@ -14,15 +15,15 @@ STANDARDIZED_FILE = PROCESSED_DIR / "standardized.json"
 METRICS_FILE = AGGREGATED_DIR / "metrics.json"
 LOG_FILE = BASE_DIR / "aggregator.log"
 
-# Logging setup
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler(LOG_FILE),
-        logging.StreamHandler()
-    ]
-)
+# Sections produced by the transformer, in output order
+KNOWN_SECTIONS = ('navbar', 'homepage', 'footer', 'case_study')
+MIN_LEN_SENTINEL = 2 ** 31  # larger than any real content length
+METRIC_PRECISION = 2  # decimal places kept for ratios and averages in metrics.json
+
+JSON_ERRORS = (ijson.JSONError, IOError)
+
+# Logging setup; file output is batched in memory and written out on ERROR or exit
+log_buffer = setup_logging(LOG_FILE)
 logger = logging.getLogger(__name__)
 
 def setup_directories():
@@ -31,188 +32,259 @@ def setup_directories():
     logger.info(f"Aggregated directory ready at {AGGREGATED_DIR}")
 
 def load_standardized_data():
-    """Load standardized data."""
+    """Load the standardized data summary and an iterator over its records.
+    
+    Records are streamed from disk one at a time instead of materializing the
+    whole records array in memory. The summary follows the records in the file,
+    so the returned dict is filled in by that same pass once the iterator is exhausted.
+    """
     if not STANDARDIZED_FILE.exists():
         logger.error(f"Standardized data file not found: {STANDARDIZED_FILE}")
         return None
     
-    try:
-        with open(STANDARDIZED_FILE, 'r', encoding='utf-8') as f:
-            return json.load(f)
-    except (json.JSONDecodeError, IOError) as e:
-        logger.error(f"Error loading standardized data: {e}")
-        return None
+    # Parsing happens lazily, so decode errors surface while main() folds the records
+    summary = {}
+    return summary, iter_standardized_records(summary)
 
-def compute_case_study_metrics(records):
-    """Compute metrics related to case studies."""
-    logger.info("Computing case study metrics...")
-    
-    # Group records by website
-    websites_data = defaultdict(dict)
-    for record in records:
+def iter_standardized_records(summary):
+    """Stream standardized records from disk one at a time, collecting `summary` in the same parse."""
+    with open(STANDARDIZED_FILE, 'rb', buffering=READ_BUFFER_SIZE) as f:
+        # Floats rather than ijson's default Decimals, which orjson cannot serialize
+        events = ijson.parse(f, buf_size=READ_BUFFER_SIZE, use_float=True)
+        builder = None
+        depth = 0
+        for prefix, event, value in events:
+            if builder is None:
+                if prefix in ('records.item', 'summary') and event == 'start_map':
+                    target = prefix
+                    builder = ijson.ObjectBuilder()
+                else:
+                    continue
+            builder.event(event, value)
+            if event in ('start_map', 'start_array'):
+                depth += 1
+            elif event in ('end_map', 'end_array'):
+                depth -= 1
+                if not depth:
+                    if target == 'summary':
+                        summary.update(builder.value)
+                    else:
+                        yield builder.value
+                    builder = None
+
+class SectionStats:
+    """Running content length statistics for a single section."""
+    
+    __slots__ = ('sum_len', 'min_len', 'max_len', 'count', 'non_empty_count')
+    
+    def __init__(self):
+        self.sum_len = 0
+        self.min_len = MIN_LEN_SENTINEL
+        self.max_len = 0
+        self.count = 0
+        self.non_empty_count = 0
+    
+    def to_metrics(self):
+        """Derive the section's content length metrics."""
+        return {
+            'average_length': self.sum_len / self.count,
+            'min_length': self.min_len,
+            'max_length': self.max_len,
+            'total_records': self.count,
+            'non_empty_records': self.non_empty_count,
+            'empty_records': self.count - self.non_empty_count,
+            'non_empty_percentage': self.non_empty_count / self.count * 100
+        }
+
+class StatsAccumulator:
+    """Single-pass fold over standardized records that backs every metric group."""
+    
+    def __init__(self):
+        self.case_study_lengths = {}
+        self.websites_activity = {}
+        # Pre-create the known sections; the hot path only creates stats for unexpected ones
+        self.section_stats = {section: SectionStats() for section in KNOWN_SECTIONS}
+        self.website_counts = Counter()
+        self.total_records = 0
+        self.total_content_length = 0
+        self.non_empty_records = 0
+        self.earliest_crawl = None
+        self.latest_crawl = None
+        self.total_timestamps = 0
+    
+    def update(self, record):
+        """Fold a single record into all counters."""
+        # Bind each lookup once per record; this runs for every record in the file
+        get = record.get
         website = record['website']
         section = record['section']
-        websites_data[website][section] = record
-    
-    # Count websites with case studies
-    websites_with_case_studies = 0
-    websites_without_case_studies = 0
-    case_study_content_lengths = []
-    
-    for website, sections in websites_data.items():
-        case_study_record = sections.get('case_study', {})
-        case_study_content = case_study_record.get('content', '')
+        content = get('content') or ''
+        content_length = len(content)
+        # Same truth value as content.strip() without building the stripped copy
+        has_text = content_length > 0 and not content.isspace()
+        
+        # Case study length per website, 0 when blank (last record wins)
+        if section == 'case_study':
+            self.case_study_lengths[website] = content_length if has_text else 0
         
-        if case_study_content and case_study_content.strip():
-            websites_with_case_studies += 1
-            case_study_content_lengths.append(len(case_study_content))
-            logger.debug(f"Website with case study: {website} ({len(case_study_content)} chars)")
-        else:
-            websites_without_case_studies += 1
-            logger.debug(f"Website without case study: {website}")
-    
-    total_websites = len(websites_data)
-    case_study_percentage = (websites_with_case_studies / total_websites * 100) if total_websites > 0 else 0
-    
-    avg_case_study_length = sum(case_study_content_lengths) / len(case_study_content_lengths) if case_study_content_lengths else 0
-    
-    logger.info(f"Case study analysis: {websites_with_case_studies}/{total_websites} websites have case studies ({case_study_percentage:.1f}%)")
-    
-    return {
-        'total_websites': total_websites,
-        'websites_with_case_studies': websites_with_case_studies,
-        'websites_without_case_studies': websites_without_case_studies,
-        'case_study_percentage': round(case_study_percentage, 2),
-        'average_case_study_length': round(avg_case_study_length, 2) if avg_case_study_length > 0 else 0
-    }
-
-def compute_activity_metrics(records):
-    """Compute active vs inactive website metrics."""
-    logger.info("Computing activity metrics...")
-    
-    # Group by website and check if any record is inactive
-    websites_activity = defaultdict(list)
-    for record in records:
-        website = record['website']
-        is_active = record.get('isActive', True)
-        websites_activity[website].append(is_active)
-    
-    active_websites = 0
-    inactive_websites = 0
-    
-    for website, activity_list in websites_activity.items():
         # Website is considered active if ALL its records are active
-        is_website_active = all(activity_list)
+        websites_activity = self.websites_activity
+        if not get('isActive', True):
+            websites_activity[website] = False
+        elif website not in websites_activity:
+            websites_activity[website] = True
         
-        if is_website_active:
-            active_websites += 1
-            logger.debug(f"Active website: {website}")
-        else:
-            inactive_websites += 1
-            logger.debug(f"Inactive website: {website}")
-    
-    total_websites = len(websites_activity)
-    active_percentage = (active_websites / total_websites * 100) if total_websites > 0 else 0
-    
-    logger.info(f"Activity analysis: {active_websites}/{total_websites} websites are active ({active_percentage:.1f}%)")
-    
-    return {
-        'total_websites': total_websites,
-        'active_websites': active_websites,
-        'inactive_websites': inactive_websites,
-        'active_percentage': round(active_percentage, 2)
-    }
-
-def compute_content_length_metrics(records):
-    """Compute average content length by section."""
-    logger.info("Computing content length metrics...")
-    
-    # Group content lengths by section
-    section_lengths = defaultdict(list)
-    section_counts = Counter()
+        # Running content length statistics per section
+        stats = self.section_stats.get(section)
+        if stats is None:
+            stats = self.section_stats[section] = SectionStats()
+        stats.sum_len += content_length
+        if content_length < stats.min_len:
+            stats.min_len = content_length
+        if content_length > stats.max_len:
+            stats.max_len = content_length
+        stats.count += 1
+        if content_length > 0:
+            stats.non_empty_count += 1
+        
+        # Overall distribution and content statistics
+        self.total_records += 1
+        self.website_counts[website] += 1
+        self.total_content_length += content_length
+        if has_text:
+            self.non_empty_records += 1
+        
+        # Running crawl period; ISO 8601 timestamps order correctly as plain strings
+        timestamp = get('crawl_timestamp')
+        if timestamp:
+            if self.earliest_crawl is None or timestamp < self.earliest_crawl:
+                self.earliest_crawl = timestamp
+            if self.latest_crawl is None or timestamp > self.latest_crawl:
+                self.latest_crawl = timestamp
+            self.total_timestamps += 1
+    
+    def case_study_metrics(self):
+        """Compute metrics related to case studies."""
+        websites_with_case_studies = 0
+        websites_without_case_studies = 0
+        case_study_total_length = 0
+        
+        for website in self.website_counts:
+            case_study_length = self.case_study_lengths.get(website, 0)
+            
+            if case_study_length:
+                websites_with_case_studies += 1
+                case_study_total_length += case_study_length
+                logger.debug(f"Website with case study: {website} ({case_study_length} chars)")
+            else:
+                websites_without_case_studies += 1
+                logger.debug(f"Website without case study: {website}")
+        
+        total_websites = len(self.website_counts)
+        case_study_percentage = (websites_with_case_studies / total_websites * 100) if total_websites > 0 else 0
+        
+        avg_case_study_length = case_study_total_length / websites_with_case_studies if websites_with_case_studies else 0
+        
+        logger.info(f"Case study analysis: {websites_with_case_studies}/{total_websites} websites have case studies ({case_study_percentage:.1f}%)")
+        
+        return {
+            'total_websites': total_websites,
+            'websites_with_case_studies': websites_with_case_studies,
+            'websites_without_case_studies': websites_without_case_studies,
+            'case_study_percentage': case_study_percentage,
+            'average_case_study_length': avg_case_study_length
+        }
     
-    for record in records:
-        section = record['section']
-        content = record.get('content', '')
-        content_length = len(content) if content else 0
+    def activity_metrics(self):
+        """Compute active vs inactive website metrics."""
+        active_websites = 0
+        inactive_websites = 0
+        
+        for website, is_website_active in self.websites_activity.items():
+            if is_website_active:
+                active_websites += 1
+                logger.debug(f"Active website: {website}")
+            else:
+                inactive_websites += 1
+                logger.debug(f"Inactive website: {website}")
+        
+        total_websites = len(self.websites_activity)
+        active_percentage = (active_websites / total_websites * 100) if total_websites > 0 else 0
         
-        section_lengths[section].append(content_length)
-        section_counts[section] += 1
+        logger.info(f"Activity analysis: {active_websites}/{total_websites} websites are active ({active_percentage:.1f}%)")
+        
+        return {
+            'total_websites': total_websites,
+            'active_websites': active_websites,
+            'inactive_websites': inactive_websites,
+            'active_percentage': active_percentage
+        }
     
-    # Calculate averages and statistics
-    section_metrics = {}
-    for section, lengths in section_lengths.items():
-        if lengths:
-            avg_length = sum(lengths) / len(lengths)
-            min_length = min(lengths)
-            max_length = max(lengths)
-            non_empty_count = sum(1 for length in lengths if length > 0)
-            empty_count = len(lengths) - non_empty_count
-            
-            section_metrics[section] = {
-                'average_length': round(avg_length, 2),
-                'min_length': min_length,
-                'max_length': max_length,
-                'total_records': len(lengths),
-                'non_empty_records': non_empty_count,
-                'empty_records': empty_count,
-                'non_empty_percentage': round((non_empty_count / len(lengths) * 100), 2) if len(lengths) > 0 else 0
-            }
+    def content_length_metrics(self):
+        """Compute average content length by section."""
+        section_metrics = {}
+        for section, stats in self.section_stats.items():
+            if not stats.count:
+                continue
+            section_metrics[section] = stats.to_metrics()
             
-            logger.info(f"Section '{section}': avg={avg_length:.1f} chars, {non_empty_count}/{len(lengths)} non-empty")
-        else:
-            section_metrics[section] = {
-                'average_length': 0,
-                'min_length': 0,
-                'max_length': 0,
-                'total_records': 0,
-                'non_empty_records': 0,
-                'empty_records': 0,
-                'non_empty_percentage': 0
-            }
+            logger.info(f"Section '{section}': avg={stats.sum_len / stats.count:.1f} chars, {stats.non_empty_count}/{stats.count} non-empty")
+        
+        return section_metrics
     
-    return section_metrics
+    def additional_metrics(self):
+        """Compute additional useful metrics."""
+        total_records = self.total_records
+        
+        return {
+            'total_records': total_records,
+            'unique_websites': len(self.website_counts),
+            'total_content_length': self.total_content_length,
+            'average_content_length_overall': self.total_content_length / total_records if total_records > 0 else 0,
+            'non_empty_records': self.non_empty_records,
+            'empty_records': total_records - self.non_empty_records,
+            'content_fill_rate': self.non_empty_records / total_records * 100 if total_records > 0 else 0,
+            'section_distribution': {section: stats.count for section, stats in self.section_stats.items() if stats.count},
+            'website_distribution': dict(self.website_counts),
+            'crawl_period': {
+                'earliest': self.earliest_crawl,
+                'latest': self.latest_crawl,
+                'total_timestamps': self.total_timestamps
+            }
+        }
 
-def compute_additional_metrics(records):
-    """Compute additional useful metrics."""
-    logger.info("Computing additional metrics...")
-    
-    total_records = len(records)
-    total_content_length = sum(len(record.get('content', '')) for record in records)
+def aggregate_all(records):
+    """Compute all metric groups in a single pass over records.
     
-    # Website distribution
-    website_counts = Counter(record['website'] for record in records)
-    unique_websites = len(website_counts)
-    
-    # Section distribution
-    section_counts = Counter(record['section'] for record in records)
+    Returns None when there are no records.
+    """
+    accumulator = StatsAccumulator()
+    update = accumulator.update
+    for record in records:
+        update(record)
     
-    # Timestamp analysis
-    timestamps = [record.get('crawl_timestamp', '') for record in records if record.get('crawl_timestamp')]
-    earliest_crawl = min(timestamps) if timestamps else None
-    latest_crawl = max(timestamps) if timestamps else None
+    if not accumulator.total_records:
+        return None
     
-    # Content statistics
-    non_empty_records = sum(1 for record in records if record.get('content', '').strip())
-    empty_records = total_records - non_empty_records
+    logger.info(f"Processed {accumulator.total_records} records")
     
     return {
-        'total_records': total_records,
-        'unique_websites': unique_websites,
-        'total_content_length': total_content_length,
-        'average_content_length_overall': round(total_content_length / total_records, 2) if total_records > 0 else 0,
-        'non_empty_records': non_empty_records,
-        'empty_records': empty_records,
-        'content_fill_rate': round((non_empty_records / total_records * 100), 2) if total_records > 0 else 0,
-        'section_distribution': dict(section_counts),
-        'website_distribution': dict(website_counts),
-        'crawl_period': {
-            'earliest': earliest_crawl,
-            'latest': latest_crawl,
-            'total_timestamps': len(timestamps)
-        }
+        'case_study_analysis': accumulator.case_study_metrics(),
+        'activity_analysis': accumulator.activity_metrics(),
+        'content_length_by_section': accumulator.content_length_metrics(),
+        'additional_metrics': accumulator.additional_metrics()
     }
 
+def round_metrics(value):
+    """Round every float in a metrics structure to METRIC_PRECISION places."""
+    if isinstance(value, float):
+        return round(value, METRIC_PRECISION)
+    if isinstance(value, dict):
+        return {key: round_metrics(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [round_metrics(item) for item in value]
+    return value
+
 def validate_metrics(metrics):
     """Validate computed metrics for consistency."""
     logger.info("Validating computed metrics...")
@@ -259,18 +331,13 @@ def main():
         logger.error("Failed to load standardized data. Exiting.")
         return
     
-    records = standardized_data.get('records', [])
-    if not records:
-        logger.error("No records found in standardized data. Exiting.")
-        return
-    
-    logger.info(f"Processing {len(records)} records...")
+    input_summary, records = standardized_data
     
     # Initialize metrics structure
     metrics = {
         'computation_time': datetime.now().isoformat(),
         'source_file': str(STANDARDIZED_FILE.relative_to(BASE_DIR)),
-        'input_summary': standardized_data.get('summary', {}),
+        'input_summary': input_summary,
         'case_study_analysis': {},
         'activity_analysis': {},
         'content_length_by_section': {},
@@ -279,25 +346,27 @@ def main():
     }
     
     try:
-        # Compute all metrics
-        logger.info("Computing case study metrics...")
-        metrics['case_study_analysis'] = compute_case_study_metrics(records)
-        
-        logger.info("Computing activity metrics...")
-        metrics['activity_analysis'] = compute_activity_metrics(records)
-        
-        logger.info("Computing content length metrics...")
-        metrics['content_length_by_section'] = compute_content_length_metrics(records)
+        # Compute all metrics in a single pass
+        logger.info("Computing metrics...")
+        try:
+            results = aggregate_all(records)
+        except JSON_ERRORS as e:
+            # A malformed file is a load failure: exit without writing metrics.json
+            logger.error(f"Error loading standardized data: {e}")
+            logger.error("Failed to load standardized data. Exiting.")
+            return
+        if not results:
+            logger.error("No records found in standardized data. Exiting.")
+            return
         
-        logger.info("Computing additional metrics...")
-        metrics['additional_metrics'] = compute_additional_metrics(records)
+        # Metrics are accumulated at full precision and rounded once for output
+        metrics.update(round_metrics(results))
         
         # Validate metrics
         metrics['validation_passed'] = validate_metrics(metrics)
         
         # Save metrics
-        with open(METRICS_FILE, 'w', encoding='utf-8') as f:
-            json.dump(metrics, f, indent=2, ensure_ascii=False)
+        METRICS_FILE.write_bytes(orjson.dumps(metrics, option=JSON_DUMP_OPTIONS))
         
         # Log summary
         logger.info("Aggregation completed successfully!")
@@ -326,8 +395,7 @@ def main():
         # Save partial results with error information
         metrics['error'] = str(e)
         try:
-            with open(METRICS_FILE, 'w', encoding='utf-8') as f:
-                json.dump(metrics, f, indent=2, ensure_ascii=False)
+            METRICS_FILE.write_bytes(orjson.dumps(metrics, option=JSON_DUMP_OPTIONS))
             logger.info("Partial results saved despite error")
         except Exception as save_error:
             logger.error(f"Failed to save partial results: {save_error}")
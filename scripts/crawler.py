@@ -1,12 +1,17 @@
 import os
-import json
-import time
+import re
+import codecs
+import asyncio
 import logging
-from urllib.parse import urlparse, urljoin
+from urllib.parse import urlparse, urlsplit, urljoin
 from datetime import datetime
-import requests
-from bs4 import BeautifulSoup
+from concurrent.futures import ThreadPoolExecutor
+import aiohttp
+import orjson
+import lxml.html
+from lxml import etree
 from pathlib import Path
+from pipeline_utils import setup_logging, JSON_DUMP_OPTIONS, READ_BUFFER_SIZE
 
 # --- Configuration ---
 URLS_TO_CRAWL = [
@@ -21,24 +26,30 @@ URLS_TO_CRAWL = [
 ]
 
 REQUEST_TIMEOUT = 10
+CRAWL_DELAY = 1  # seconds before each follow-up request to a host
+PER_HOST_CONCURRENCY = 2  # max in-flight requests per host
+MAX_WORKER_THREADS = 8  # threads for parsing and file writes
+CONNECTION_POOL_SIZE = 32  # total keep-alive connections across hosts
+KEEPALIVE_TIMEOUT = 30  # seconds an idle connection stays pooled
+MAX_RETRIES = 2
+RETRY_BACKOFF = 0.5  # seconds, doubled on each retry
+RETRY_STATUSES = {500, 502, 503, 504}
 USER_AGENT = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36"
+REQUEST_HEADERS = {
+    'User-Agent': USER_AGENT,
+    'Accept-Encoding': 'gzip, deflate',
+}
 
 # Paths
 BASE_DIR = Path(__file__).resolve().parent.parent
 DATA_DIR = BASE_DIR / "data"
 RAW_DATA_DIR = DATA_DIR / "raw"
 METADATA_FILE = DATA_DIR / "metadata.json"
+METADATA_JOURNAL_FILE = DATA_DIR / "metadata.jsonl"
 LOG_FILE = BASE_DIR / "crawler.log"
 
-# Logging setup
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler(LOG_FILE),
-        logging.StreamHandler()
-    ]
-)
+# Logging setup; file output is batched in memory and written out on ERROR or exit
+log_buffer = setup_logging(LOG_FILE)
 logger = logging.getLogger(__name__)
 
 def setup_directories():
@@ -47,25 +58,54 @@ def setup_directories():
     logger.info(f"Data directory ready at {RAW_DATA_DIR}")
 
 def load_metadata():
-    """Load existing metadata or return empty dict."""
+    """Load existing metadata, replaying any journal left by an interrupted run."""
+    metadata = {}
     if METADATA_FILE.exists():
         try:
-            with open(METADATA_FILE, 'r', encoding='utf-8') as f:
-                return json.load(f)
-        except (json.JSONDecodeError, IOError) as e:
+            with open(METADATA_FILE, 'rb', buffering=READ_BUFFER_SIZE) as f:
+                metadata = orjson.loads(f.read())
+        except (orjson.JSONDecodeError, IOError) as e:
             logger.error(f"Error loading metadata: {e}. Starting fresh.")
-            return {}
-    return {}
+            metadata = {}
+    
+    if METADATA_JOURNAL_FILE.exists():
+        try:
+            with open(METADATA_JOURNAL_FILE, 'rb', buffering=READ_BUFFER_SIZE) as f:
+                for line in f:
+                    try:
+                        metadata.update(orjson.loads(line))
+                    except orjson.JSONDecodeError:
+                        # A crash can leave a partially written last line
+                        logger.warning("Skipping corrupt metadata journal entry")
+            logger.info(f"Replayed metadata journal {METADATA_JOURNAL_FILE}")
+        except IOError as e:
+            logger.error(f"Error replaying metadata journal: {e}")
+    
+    return metadata
 
 def save_metadata(metadata):
-    """Save metadata to JSON file."""
+    """Save metadata to JSON file. Returns True on success."""
     try:
         DATA_DIR.mkdir(parents=True, exist_ok=True)
-        with open(METADATA_FILE, 'w', encoding='utf-8') as f:
-            json.dump(metadata, f, indent=2, ensure_ascii=False)
+        METADATA_FILE.write_bytes(orjson.dumps(metadata, option=JSON_DUMP_OPTIONS))
         logger.info("Metadata saved successfully")
+        return True
     except Exception as e:
         logger.error(f"Failed to save metadata: {e}")
+        return False
+
+def append_metadata_journal(journal, crawl_data):
+    """Append one site's crawl data to the metadata journal (one JSON object per line)."""
+    try:
+        journal.write(orjson.dumps({crawl_data['url']: crawl_data}) + b'\n')
+        journal.flush()
+    except Exception as e:
+        logger.error(f"Failed to append metadata journal for {crawl_data['url']}: {e}")
+
+def consolidate_metadata(metadata):
+    """Rewrite canonical metadata.json and drop the journal it supersedes."""
+    if save_metadata(metadata):
+        METADATA_JOURNAL_FILE.unlink(missing_ok=True)
 
 def get_domain_name(url):
     """Extract clean domain name from URL."""
@@ -76,40 +116,83 @@ def get_domain_name(url):
         domain = domain[4:]
     return domain
 
-def fetch_url(url, session=None):
-    """Fetch URL with error handling and retries."""
-    if session is None:
-        session = requests.Session()
+async def fetch_url(url, session):
+    """Fetch URL with error handling and retries. Returns a dict with status code, raw body and encoding, or None.
     
-    headers = {'User-Agent': USER_AGENT}
+    Timeouts, connection errors and RETRY_STATUSES responses are retried up to
+    MAX_RETRIES times with exponential backoff.
+    """
+    logger.info(f"Fetching: {url}")
+    for attempt in range(MAX_RETRIES + 1):
+        if attempt:
+            await asyncio.sleep(RETRY_BACKOFF * 2 ** (attempt - 1))
+            logger.info(f"Retrying ({attempt}/{MAX_RETRIES}): {url}")
+        
+        try:
+            async with session.get(url) as response:
+                if response.status in RETRY_STATUSES and attempt < MAX_RETRIES:
+                    error = f"HTTP error {response.status} fetching {url}"
+                else:
+                    response.raise_for_status()
+                    return {
+                        'status_code': response.status,
+                        'content': await response.read(),
+                        'encoding': response.get_encoding()
+                    }
+        except asyncio.TimeoutError:
+            error = f"Timeout fetching {url}"
+        except aiohttp.ClientResponseError as e:
+            logger.error(f"HTTP error {e.status} fetching {url}")
+            return None
+        except aiohttp.ClientConnectionError:
+            error = f"Connection error fetching {url}"
+        except Exception as e:
+            logger.error(f"Unexpected error fetching {url}: {e}")
+            return None
+        
+        if attempt < MAX_RETRIES:
+            logger.warning(error)
     
-    try:
-        logger.info(f"Fetching: {url}")
-        response = session.get(url, headers=headers, timeout=REQUEST_TIMEOUT)
-        response.raise_for_status()
-        return response
-    except requests.exceptions.Timeout:
-        logger.error(f"Timeout fetching {url}")
-        return None
-    except requests.exceptions.ConnectionError:
-        logger.error(f"Connection error fetching {url}")
-        return None
-    except requests.exceptions.HTTPError as e:
-        logger.error(f"HTTP error {e.response.status_code} fetching {url}")
-        return None
-    except Exception as e:
-        logger.error(f"Unexpected error fetching {url}: {e}")
-        return None
+    logger.error(error)
+    return None
+
+def decode_body(response):
+    """Decode a fetched body to text using the response's charset."""
+    return response['content'].decode(response['encoding'], errors='replace')
+
+def encode_body(response):
+    """Return a fetched body as UTF-8 bytes for disk, passing UTF-8 bodies through untouched."""
+    content = response['content']
+    if codecs.lookup(response['encoding']).name == 'utf-8':
+        if content.isascii():
+            return content
+        try:
+            content.decode('utf-8')
+            return content
+        except UnicodeDecodeError:
+            pass  # invalid sequences get replaced as before
+    return decode_body(response).encode('utf-8')
+
+async def run_blocking(func, *args):
+    """Run blocking parse/disk work in the thread pool so other sites keep fetching."""
+    return await asyncio.get_running_loop().run_in_executor(None, func, *args)
+
+async def polite_fetch(url, session, semaphore, delay=CRAWL_DELAY):
+    """Fetch URL under the host's semaphore, waiting `delay` seconds first."""
+    async with semaphore:
+        await asyncio.sleep(delay)
+        return await fetch_url(url, session)
 
 def save_html_file(content, domain, filename):
-    """Save HTML content to domain-specific directory."""
+    """Save HTML content (UTF-8 bytes or text) to domain-specific directory."""
     try:
         domain_dir = RAW_DATA_DIR / domain
         domain_dir.mkdir(parents=True, exist_ok=True)
         
         filepath = domain_dir / filename
-        with open(filepath, 'w', encoding='utf-8') as f:
-            f.write(content)
+        data = content if isinstance(content, bytes) else content.encode('utf-8')
+        with open(filepath, 'wb') as f:
+            f.write(data)
         
         logger.info(f"Saved {filename} for {domain}")
         return str(filepath.relative_to(BASE_DIR))
@@ -117,124 +200,210 @@ def save_html_file(content, domain, filename):
         logger.error(f"Error saving {filename} for {domain}: {e}")
         return None
 
-def extract_navbar_html(html_content):
-    """Extract navbar HTML from page content."""
+def save_response_body(response, domain, filename):
+    """Save a fetched body as UTF-8; re-encoding happens here so it stays off the event loop."""
+    return save_html_file(encode_body(response), domain, filename)
+
+def _class_xpath(class_name):
+    """XPath predicate matching a single token of the class attribute (like CSS `.name`)."""
+    return f"contains(concat(' ', normalize-space(@class), ' '), ' {class_name} ')"
+
+# Precompiled XPath lookups, tried in order of preference
+NAVBAR_XPATHS = [
+    etree.XPath("(//nav)[1]"),
+    etree.XPath("(//header//nav)[1]"),
+    etree.XPath("(//*[@role='navigation'])[1]"),
+    etree.XPath(f"(//*[{_class_xpath('navbar')}])[1]"),
+    etree.XPath(f"(//*[{_class_xpath('nav')}])[1]"),
+    etree.XPath(f"(//*[{_class_xpath('navigation')}])[1]"),
+    etree.XPath("(//header)[1]"),
+]
+
+FOOTER_XPATHS = [
+    etree.XPath("(//footer)[1]"),
+    etree.XPath("(//*[@role='contentinfo'])[1]"),
+    etree.XPath(f"(//*[{_class_xpath('footer')}])[1]"),
+    etree.XPath(f"(//*[{_class_xpath('site-footer')}])[1]"),
+    etree.XPath("(//*[@id='footer'])[1]"),
+]
+
+LINK_XPATH = etree.XPath("//a[@href]")
+
+# Keywords to look for in URLs and link text
+CASE_STUDY_RE = re.compile(r'case|success|story|customer|testimonial', re.IGNORECASE)
+
+# Non-HTML resources that are never crawled as internal pages
+SKIP_SUFFIX_RE = re.compile(r'\.(?:pdf|jpe?g|png|gif|zip|svg|webp|ico|css|js)$', re.IGNORECASE)
+
+def parse_html(content, encoding=None):
+    """Parse raw HTML bytes once into an lxml tree shared by all extractors."""
     try:
-        soup = BeautifulSoup(html_content, 'html.parser')
-        
-        # Try multiple selectors for navbar
-        navbar_selectors = [
-            'nav',
-            'header nav',
-            '[role="navigation"]',
-            '.navbar',
-            '.nav',
-            '.navigation',
-            'header'
-        ]
+        # Comments and processing instructions are never read, so don't build nodes for them.
+        # A parser per call: lxml parser objects must not be shared across worker threads.
+        try:
+            parser = lxml.html.HTMLParser(encoding=encoding, remove_comments=True, remove_pis=True)
+        except LookupError:
+            # libxml2 doesn't know every Python codec name (e.g. euc_jp, latin-1); decode here instead
+            parser = lxml.html.HTMLParser(remove_comments=True, remove_pis=True)
+            content = content.decode(encoding, errors='replace')
+        return lxml.html.document_fromstring(content, parser=parser)
+    except Exception as e:
+        logger.error(f"Error parsing HTML: {e}")
+        return None
+
+def find_first_element(tree, xpaths):
+    """Return the first element matched by the given XPath lookups, in order."""
+    for xpath in xpaths:
+        matches = xpath(tree)
+        if matches:
+            return matches[0]
+    return None
+
+def extract_navbar_html(tree):
+    """Extract navbar HTML from a parsed page."""
+    try:
+        if tree is None:
+            return None
         
-        for selector in navbar_selectors:
-            navbar = soup.select_one(selector)
-            if navbar:
-                return str(navbar)
+        navbar = find_first_element(tree, NAVBAR_XPATHS)
+        if navbar is not None:
+            return lxml.html.tostring(navbar, encoding='unicode', with_tail=False)
         
         return None
     except Exception as e:
         logger.error(f"Error extracting navbar: {e}")
         return None
 
-def extract_footer_html(html_content):
-    """Extract footer HTML from page content."""
+def extract_footer_html(tree):
+    """Extract footer HTML from a parsed page."""
     try:
-        soup = BeautifulSoup(html_content, 'html.parser')
+        if tree is None:
+            return None
         
-        # Try multiple selectors for footer
-        footer_selectors = [
-            'footer',
-            '[role="contentinfo"]',
-            '.footer',
-            '.site-footer',
-            '#footer'
-        ]
-        
-        for selector in footer_selectors:
-            footer = soup.select_one(selector)
-            if footer:
-                return str(footer)
+        footer = find_first_element(tree, FOOTER_XPATHS)
+        if footer is not None:
+            return lxml.html.tostring(footer, encoding='unicode', with_tail=False)
         
         return None
     except Exception as e:
         logger.error(f"Error extracting footer: {e}")
         return None
 
-def find_case_study_url(base_url, html_content):
-    """Find case study or success story URL using pattern matching."""
+def extract_links(base_url, tree, max_internal=2):
+    """Find the case study URL and up to `max_internal` internal links in one pass over the anchors.
+    
+    Returns (case_study_url, internal_links). The case study page is not repeated in internal_links.
+    """
+    case_study_url = None
+    candidates = []  # qualifying internal URLs in document order, de-duplicated
     try:
-        soup = BeautifulSoup(html_content, 'html.parser')
-        base_domain = urlparse(base_url).netloc
+        if tree is None:
+            return case_study_url, candidates
         
-        # Keywords to look for in URLs and link text
-        case_study_keywords = ['case', 'success', 'story', 'customer', 'testimonial']
+        base_domain = urlsplit(base_url).netloc
+        resolved_hrefs = {}  # href -> full URL, or None if it is not a candidate
+        seen_links = set()
         
-        for link in soup.find_all('a', href=True):
-            href = link['href']
-            link_text = link.get_text().lower().strip()
-            href_lower = href.lower()
-            
-            # Check if URL or link text contains case study keywords
-            if any(keyword in href_lower or keyword in link_text for keyword in case_study_keywords):
+        for link in LINK_XPATH(tree):
+            href = link.get('href')
+            if href in resolved_hrefs:
+                # Repeated href: already joined and judged, only its link text can still matter
+                full_url = resolved_hrefs[href]
+                if (full_url is not None and case_study_url is None and
+                        CASE_STUDY_RE.search(link.text_content())):
+                    case_study_url = full_url
+            else:
                 full_url = urljoin(base_url, href)
-                parsed_url = urlparse(full_url)
+                parsed_url = urlsplit(full_url)
                 
-                # Ensure it's internal and valid
-                if (parsed_url.netloc == base_domain and 
-                    parsed_url.scheme in ('http', 'https') and
-                    full_url != base_url):
-                    return full_url
-        
-        return None
-    except Exception as e:
-        logger.error(f"Error finding case study URL: {e}")
-        return None
-
-def extract_internal_links(base_url, html_content, max_links=2):
-    """Extract internal links from the same domain (reduced to 2 since we now have case study)."""
-    try:
-        soup = BeautifulSoup(html_content, 'html.parser')
-        base_domain = urlparse(base_url).netloc
-        internal_links = []
-        
-        # Find all links
-        for link in soup.find_all('a', href=True):
-            href = link['href']
-            full_url = urljoin(base_url, href)
-            parsed_url = urlparse(full_url)
-            
-            # Check if it's internal and not just a fragment
-            if (parsed_url.netloc == base_domain and 
-                parsed_url.scheme in ('http', 'https') and
-                parsed_url.path != '/' and  # Skip homepage
-                not parsed_url.path.endswith(('.pdf', '.jpg', '.png', '.gif', '.zip')) and
-                full_url != base_url):
+                # Only internal, valid links other than the base URL are candidates
+                if (parsed_url.netloc != base_domain or
+                    parsed_url.scheme not in ('http', 'https') or
+                    full_url == base_url):
+                    resolved_hrefs[href] = None
+                    continue
+                resolved_hrefs[href] = full_url
+                
+                # Check if URL or link text contains case study keywords
+                if case_study_url is None and (CASE_STUDY_RE.search(href) or CASE_STUDY_RE.search(link.text_content())):
+                    case_study_url = full_url
                 
-                if full_url not in internal_links:
-                    internal_links.append(full_url)
-                    if len(internal_links) >= max_links:
-                        break
+                # Internal page: skip homepage, binary files and duplicates
+                if (parsed_url.path != '/' and
+                    not SKIP_SUFFIX_RE.search(parsed_url.path) and
+                    full_url not in seen_links):
+                    seen_links.add(full_url)
+                    candidates.append(full_url)
+            
+            # Stop once the case study is known and enough other candidates are in hand
+            if (case_study_url is not None and
+                    len(candidates) - (case_study_url in seen_links) >= max_internal):
+                break
         
-        return internal_links[:max_links]
+        return case_study_url, [url for url in candidates if url != case_study_url][:max_internal]
     except Exception as e:
-        logger.error(f"Error extracting internal links from {base_url}: {e}")
-        return []
+        logger.error(f"Error extracting links from {base_url}: {e}")
+        return case_study_url, [url for url in candidates if url != case_study_url][:max_internal]
 
-def crawl_website(base_url, metadata, session):
-    """Crawl a single website: homepage + navbar + footer + case study + 2 internal links."""
+def process_homepage(base_url, domain, homepage_response, crawl_data):
+    """Save the homepage and its navbar/footer, and find the links to follow.
+    
+    This is blocking parse and disk work, so crawl_website runs it in the thread pool.
+    Returns (case_study_url, internal_links).
+    """
+    # Save homepage
+    homepage_path = save_response_body(homepage_response, domain, 'homepage.html')
+    crawl_data['pages']['homepage'] = {
+        'url': base_url,
+        'http_status': homepage_response['status_code'],
+        'file_path': homepage_path,
+        'content_length': len(homepage_response['content'])  # bytes; components below count chars
+    }
+    
+    # Parse the homepage once; all extractors share the tree
+    homepage_tree = parse_html(homepage_response['content'], homepage_response['encoding'])
+    
+    # Extract and save navbar
+    navbar_html = extract_navbar_html(homepage_tree)
+    if navbar_html:
+        navbar_path = save_html_file(navbar_html, domain, 'navbar.html')
+        crawl_data['components']['navbar'] = {
+            'file_path': navbar_path,
+            'content_length': len(navbar_html)
+        }
+        logger.info(f"Extracted navbar for {domain}")
+    else:
+        logger.warning(f"No navbar found for {domain}")
+    
+    # Extract and save footer
+    footer_html = extract_footer_html(homepage_tree)
+    if footer_html:
+        footer_path = save_html_file(footer_html, domain, 'footer.html')
+        crawl_data['components']['footer'] = {
+            'file_path': footer_path,
+            'content_length': len(footer_html)
+        }
+        logger.info(f"Extracted footer for {domain}")
+    else:
+        logger.warning(f"No footer found for {domain}")
+    
+    # Find case study page and internal links (reduced to 2 since we have case study)
+    case_study_url, internal_links = extract_links(base_url, homepage_tree, max_internal=2)
+    
+    return case_study_url, internal_links
+
+async def crawl_website(base_url, metadata, session, semaphores):
+    """Crawl a single website: homepage + navbar + footer + case study + 2 internal links.
+    
+    Returns the site's crawl data, or None if it was skipped.
+    """
     domain = get_domain_name(base_url)
+    logger.info(f"Processing {base_url}")
     
     # Check idempotency - skip if already crawled successfully
     if base_url in metadata and metadata[base_url].get('status') == 'completed':
         logger.info(f"Skipping {base_url} - already crawled successfully")
-        return
+        return None
     
     crawl_data = {
         'url': base_url,
@@ -246,61 +415,42 @@ def crawl_website(base_url, metadata, session):
         'components': {}
     }
     
+    # Requests to the same host share a semaphore so different hosts crawl in parallel
+    semaphore = semaphores.setdefault(domain, asyncio.Semaphore(PER_HOST_CONCURRENCY))
+    
     try:
         # Fetch homepage
-        homepage_response = fetch_url(base_url, session)
+        async with semaphore:
+            homepage_response = await fetch_url(base_url, session)
         if not homepage_response:
             logger.error(f"Failed to fetch homepage for {base_url}")
             metadata[base_url] = crawl_data
-            return
+            return crawl_data
         
-        # Save homepage
-        homepage_path = save_html_file(homepage_response.text, domain, 'homepage.html')
-        crawl_data['pages']['homepage'] = {
-            'url': base_url,
-            'http_status': homepage_response.status_code,
-            'file_path': homepage_path,
-            'content_length': len(homepage_response.text)
-        }
+        # Parse and save the homepage off the event loop
+        case_study_url, internal_links = await run_blocking(
+            process_homepage, base_url, domain, homepage_response, crawl_data
+        )
         
-        # Extract and save navbar
-        navbar_html = extract_navbar_html(homepage_response.text)
-        if navbar_html:
-            navbar_path = save_html_file(navbar_html, domain, 'navbar.html')
-            crawl_data['components']['navbar'] = {
-                'file_path': navbar_path,
-                'content_length': len(navbar_html)
-            }
-            logger.info(f"Extracted navbar for {domain}")
-        else:
-            logger.warning(f"No navbar found for {domain}")
+        # Case study and internal pages are independent, so fetch them concurrently
+        pending = [polite_fetch(link_url, session, semaphore) for link_url in internal_links]
+        if case_study_url:
+            logger.info(f"Found case study URL for {domain}: {case_study_url}")
+            pending.insert(0, polite_fetch(case_study_url, session, semaphore))
+        logger.info(f"Found {len(internal_links)} internal links for {domain}")
         
-        # Extract and save footer
-        footer_html = extract_footer_html(homepage_response.text)
-        if footer_html:
-            footer_path = save_html_file(footer_html, domain, 'footer.html')
-            crawl_data['components']['footer'] = {
-                'file_path': footer_path,
-                'content_length': len(footer_html)
-            }
-            logger.info(f"Extracted footer for {domain}")
-        else:
-            logger.warning(f"No footer found for {domain}")
+        responses = await asyncio.gather(*pending)
+        link_responses = responses[1:] if case_study_url else responses
         
-        # Find and fetch case study page
-        case_study_url = find_case_study_url(base_url, homepage_response.text)
         if case_study_url:
-            logger.info(f"Found case study URL for {domain}: {case_study_url}")
-            time.sleep(1)  # Polite delay
-            
-            case_study_response = fetch_url(case_study_url, session)
+            case_study_response = responses[0]
             if case_study_response:
-                case_study_path = save_html_file(case_study_response.text, domain, 'case_study.html')
+                case_study_path = await run_blocking(save_response_body, case_study_response, domain, 'case_study.html')
                 crawl_data['pages']['case_study'] = {
                     'url': case_study_url,
-                    'http_status': case_study_response.status_code,
+                    'http_status': case_study_response['status_code'],
                     'file_path': case_study_path,
-                    'content_length': len(case_study_response.text)
+                    'content_length': len(case_study_response['content'])
                 }
                 logger.info(f"Successfully crawled case study for {domain}")
             else:
@@ -308,23 +458,16 @@ def crawl_website(base_url, metadata, session):
         else:
             logger.info(f"No case study found for {domain}")
         
-        # Extract and crawl internal links (reduced to 2 since we have case study)
-        internal_links = extract_internal_links(base_url, homepage_response.text, max_links=2)
-        logger.info(f"Found {len(internal_links)} internal links for {domain}")
-        
-        for i, link_url in enumerate(internal_links, 1):
-            time.sleep(1)  # Be polite - 1 second delay between requests
-            
-            link_response = fetch_url(link_url, session)
+        for i, (link_url, link_response) in enumerate(zip(internal_links, link_responses), 1):
             if link_response:
                 filename = f'internal_page_{i}.html'
-                file_path = save_html_file(link_response.text, domain, filename)
+                file_path = await run_blocking(save_response_body, link_response, domain, filename)
                 
                 crawl_data['pages'][f'internal_{i}'] = {
                     'url': link_url,
-                    'http_status': link_response.status_code,
+                    'http_status': link_response['status_code'],
                     'file_path': file_path,
-                    'content_length': len(link_response.text)
+                    'content_length': len(link_response['content'])
                 }
                 logger.info(f"Successfully crawled internal page {i} for {domain}")
             else:
@@ -341,6 +484,32 @@ def crawl_website(base_url, metadata, session):
     
     finally:
         metadata[base_url] = crawl_data
+    
+    return crawl_data
+
+async def crawl_all(metadata):
+    """Crawl all configured websites concurrently over a shared session."""
+    semaphores = {}
+    timeout = aiohttp.ClientTimeout(total=REQUEST_TIMEOUT)
+    
+    # Thread pool behind run_blocking; asyncio.run shuts it down on exit
+    asyncio.get_running_loop().set_default_executor(ThreadPoolExecutor(max_workers=MAX_WORKER_THREADS))
+    
+    with open(METADATA_JOURNAL_FILE, 'ab') as journal:
+        # Shared session with a pooled keep-alive connector for connection reuse
+        connector = aiohttp.TCPConnector(
+            limit=CONNECTION_POOL_SIZE,
+            limit_per_host=PER_HOST_CONCURRENCY,
+            keepalive_timeout=KEEPALIVE_TIMEOUT
+        )
+        async with aiohttp.ClientSession(connector=connector, headers=REQUEST_HEADERS, timeout=timeout) as session:
+            tasks = [crawl_website(base_url, metadata, session, semaphores) for base_url in URLS_TO_CRAWL]
+            for finished in asyncio.as_completed(tasks):
+                crawl_data = await finished
+                
+                # Journal metadata after each website (for crash recovery)
+                if crawl_data:
+                    append_metadata_journal(journal, crawl_data)
 
 def main():
     """Main crawler function."""
@@ -350,20 +519,8 @@ def main():
     # Load existing metadata for idempotency
     metadata = load_metadata()
     
-    # Create session for connection reuse
-    session = requests.Session()
-    session.headers.update({'User-Agent': USER_AGENT})
-    
     try:
-        for base_url in URLS_TO_CRAWL:
-            logger.info(f"Processing {base_url}")
-            crawl_website(base_url, metadata, session)
-            
-            # Save metadata after each website (for crash recovery)
-            save_metadata(metadata)
-            
-            # Polite delay between websites
-            time.sleep(2)
+        asyncio.run(crawl_all(metadata))
         
         # Final summary
         completed = sum(1 for data in metadata.values() if data.get('status') == 'completed')
@@ -378,8 +535,7 @@ def main():
     except Exception as e:
         logger.error(f"Unexpected error in main: {e}")
     finally:
-        session.close()
-        save_metadata(metadata)
+        consolidate_metadata(metadata)
 
 if __name__ == "__main__":
     main()
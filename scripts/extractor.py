@@ -1,30 +1,62 @@
 import os
-import json
 import logging
 import re
+from functools import lru_cache
 from pathlib import Path
 from datetime import datetime
-from bs4 import BeautifulSoup, Comment
+from concurrent.futures import ProcessPoolExecutor
+import orjson
+from bs4 import BeautifulSoup, SoupStrainer, Tag
 from urllib.parse import urlparse
+from pipeline_utils import setup_logging, build_domain_index, READ_BUFFER_SIZE
+
+try:
+    import lxml
+except ImportError:
+    lxml = None
+
+try:
+    from selectolax.lexbor import LexborHTMLParser
+except ImportError:
+    LexborHTMLParser = None
 
 # Configuration
 BASE_DIR = Path(__file__).resolve().parent.parent
 DATA_DIR = BASE_DIR / "data"
 RAW_DATA_DIR = DATA_DIR / "raw"
 PROCESSED_DIR = DATA_DIR / "processed"
-OUTPUT_FILE = PROCESSED_DIR / "extracted.json"
+OUTPUT_FILE = PROCESSED_DIR / "extracted.jsonl"  # one JSON object per domain per line
 METADATA_FILE = DATA_DIR / "metadata.json"
 LOG_FILE = BASE_DIR / "extractor.log"
 
-# Logging setup
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler(LOG_FILE),
-        logging.StreamHandler()
-    ]
-)
+WRITE_BUFFER_SIZE = 1024 * 1024  # batch many domain lines into few write() syscalls
+MAX_WORKER_PROCESSES = os.cpu_count() or 1  # parsing is CPU-bound, so one process per core
+
+# C-backed lxml tree builder when available; the stdlib parser keeps minimal installs working
+HTML_PARSER = 'lxml' if lxml else 'html.parser'
+
+# Any run of whitespace (spaces, tabs, newlines, Unicode spaces) collapses to one space
+WHITESPACE_RE = re.compile(r'\s+')
+
+# Class names of navigation/footer blocks dropped from the body fallback
+NAV_CLASS_RE = re.compile(r'nav|footer|sidebar', re.I)
+
+# Keywords marking a URL as a case study page
+CASE_STUDY_RE = re.compile(r'case|success|story|customer|testimonial', re.IGNORECASE)
+
+# Page types whose extraction never looks outside <body>. lxml always builds a body,
+# so for these we can skip building <head> (scripts, styles, meta) altogether.
+BODY_CONTENT_TYPES = {'homepage', 'main', 'case_study'}
+BODY_STRAINER = SoupStrainer('body')
+
+# Simple selectors that map onto BeautifulSoup find() without going through soupsieve
+TAG_SELECTOR_RE = re.compile(r'^[a-z][a-z0-9]*$')
+CLASS_SELECTOR_RE = re.compile(r'^\.([\w-]+)$')
+ID_SELECTOR_RE = re.compile(r'^#([\w-]+)$')
+ATTR_SELECTOR_RE = re.compile(r'^\[([\w-]+)="([^"]*)"\]$')
+
+# Logging setup; file output is batched in memory and written out on ERROR or exit
+log_buffer = setup_logging(LOG_FILE)
 logger = logging.getLogger(__name__)
 
 def setup_directories():
@@ -36,9 +68,9 @@ def load_metadata():
     """Load crawler metadata to understand file structure."""
     if METADATA_FILE.exists():
         try:
-            with open(METADATA_FILE, 'r', encoding='utf-8') as f:
-                return json.load(f)
-        except (json.JSONDecodeError, IOError) as e:
+            with open(METADATA_FILE, 'rb', buffering=READ_BUFFER_SIZE) as f:
+                return orjson.loads(f.read())
+        except (orjson.JSONDecodeError, IOError) as e:
             logger.error(f"Error loading metadata: {e}")
             return {}
     return {}
@@ -48,40 +80,81 @@ def clean_text(text):
     if not text:
         return ""
     
-    # Remove extra whitespace and normalize
-    text = re.sub(r'\s+', ' ', text.strip())
-    
-    # Remove common unwanted characters
-    text = re.sub(r'[\r\n\t]+', ' ', text)
-    
-    # Remove multiple spaces
-    text = re.sub(r' {2,}', ' ', text)
+    # \s+ already covers \r, \n, \t and repeated spaces, so one pass normalizes everything
+    return WHITESPACE_RE.sub(' ', text).strip()
+
+@lru_cache(maxsize=None)
+def find_arguments(selector):
+    """Translate a tag, .class, #id or [attr="value"] selector into find() keyword arguments.
     
-    return text.strip()
+    Returns None for anything else, which is left to select_one.
+    """
+    if TAG_SELECTOR_RE.match(selector):
+        return {'name': selector}
+    match = CLASS_SELECTOR_RE.match(selector)
+    if match:
+        return {'class_': match.group(1)}
+    match = ID_SELECTOR_RE.match(selector)
+    if match:
+        return {'id': match.group(1)}
+    match = ATTR_SELECTOR_RE.match(selector)
+    if match:
+        return {'attrs': {match.group(1): match.group(2)}}
+    return None
+
+def select_first(tree, selector):
+    """Return the first element matching a CSS selector in a Lexbor or BeautifulSoup tree."""
+    if isinstance(tree, Tag):
+        arguments = find_arguments(selector)
+        if arguments is not None:
+            return tree.find(**arguments)
+        return tree.select_one(selector)
+    return tree.css_first(selector)
+
+def remove_nodes(nodes):
+    """Decompose Lexbor nodes, skipping those nested in another node being removed."""
+    pending = {node.mem_id: node for node in nodes}
+    # Pick the outermost nodes first; decomposing frees the whole subtree
+    outermost = []
+    for node in pending.values():
+        parent = node.parent
+        while parent is not None and parent.mem_id not in pending:
+            parent = parent.parent
+        if parent is None:
+            outermost.append(node)
+    for node in outermost:
+        node.decompose()
 
 def extract_text_from_soup(soup):
-    """Extract clean text from BeautifulSoup object."""
+    """Extract clean text from a Lexbor node or BeautifulSoup object."""
     if not soup:
         return ""
     
+    if not isinstance(soup, Tag):
+        # Lexbor text() already leaves out comments
+        remove_nodes(soup.css('script, style, noscript'))
+        return clean_text(soup.text())
+    
     # Remove script and style elements
-    for script in soup(["script", "style", "noscript"]):
+    for script in soup.find_all(["script", "style", "noscript"]):
         script.decompose()
     
-    # Remove comments
-    for comment in soup.find_all(string=lambda text: isinstance(text, Comment)):
-        comment.extract()
-    
-    # Get text and clean it
+    # Get text and clean it; like Lexbor, get_text() only yields text and CDATA, never comments
     text = soup.get_text()
     return clean_text(text)
 
-def read_html_file(file_path):
-    """Read and parse HTML file."""
+def read_html_file(file_path, content_type=None):
+    """Read and parse HTML file with Lexbor, or BeautifulSoup when selectolax is missing."""
     try:
-        with open(file_path, 'r', encoding='utf-8') as f:
+        # The parsers decode bytes natively. The crawler always saves UTF-8, so it is named
+        # explicitly rather than trusting a <meta charset> that may describe the original page.
+        with open(file_path, 'rb') as f:
             content = f.read()
-        return BeautifulSoup(content, 'html.parser')
+        if LexborHTMLParser:
+            return LexborHTMLParser(content)
+        # Only build the parts `content_type` needs
+        parse_only = BODY_STRAINER if lxml and content_type in BODY_CONTENT_TYPES else None
+        return BeautifulSoup(content, HTML_PARSER, parse_only=parse_only, from_encoding='utf-8')
     except Exception as e:
         logger.error(f"Error reading {file_path}: {e}")
         return None
@@ -103,7 +176,7 @@ def extract_navbar_text(soup):
     ]
     
     for selector in navbar_selectors:
-        navbar = soup.select_one(selector)
+        navbar = select_first(soup, selector)
         if navbar:
             return extract_text_from_soup(navbar)
     
@@ -124,7 +197,7 @@ def extract_footer_text(soup):
     ]
     
     for selector in footer_selectors:
-        footer = soup.select_one(selector)
+        footer = select_first(soup, selector)
         if footer:
             return extract_text_from_soup(footer)
     
@@ -147,42 +220,44 @@ def extract_main_content_text(soup):
     
     # First try specific main content areas
     for selector in main_selectors:
-        main_content = soup.select_one(selector)
+        main_content = select_first(soup, selector)
         if main_content:
             return extract_text_from_soup(main_content)
     
     # Fallback: extract from body but exclude nav and footer
+    if not isinstance(soup, Tag):
+        body = soup.body
+        if body:
+            # Lexbor's css() also matches the node it is called on; only prune descendants like find_all does
+            body_id = body.mem_id
+            navigation = [node for node in body.css('nav, header, footer') if node.mem_id != body_id]
+            navigation.extend(node for node in body.css('[class]')
+                              if node.mem_id != body_id and NAV_CLASS_RE.search(node.attributes['class'] or ''))
+            remove_nodes(navigation)
+            return extract_text_from_soup(body)
+        return extract_text_from_soup(soup)
+    
     body = soup.find('body')
     if body:
-        # Clone the body to avoid modifying original
-        body_copy = BeautifulSoup(str(body), 'html.parser')
-        
-        # Remove navigation and footer elements
-        for nav in body_copy(['nav', 'header', 'footer']):
+        # Each file's soup is used for one extraction only, so it is safe to prune in place
+        for nav in body(['nav', 'header', 'footer']):
             nav.decompose()
         
         # Remove elements with navigation/footer classes
-        for elem in body_copy.find_all(class_=re.compile(r'nav|footer|sidebar', re.I)):
+        for elem in body.find_all(class_=NAV_CLASS_RE):
             elem.decompose()
         
-        return extract_text_from_soup(body_copy)
+        return extract_text_from_soup(body)
     
     # Last resort: get all text
     return extract_text_from_soup(soup)
 
 def is_case_study_url(url):
     """Check if URL indicates a case study page."""
-    if not url:
-        return False
-    
-    url_lower = url.lower()
-    case_study_keywords = ['case', 'success', 'story', 'customer', 'testimonial']
-    
-    return any(keyword in url_lower for keyword in case_study_keywords)
+    return bool(url and CASE_STUDY_RE.search(url))
 
-def extract_from_html_file(file_path, content_type, url=None):
-    """Extract text from a single HTML file based on content type."""
-    soup = read_html_file(file_path)
+def extract_from_html_file(soup, content_type, url=None):
+    """Extract text from a parsed HTML file based on content type."""
     if not soup:
         return ""
     
@@ -200,7 +275,7 @@ def extract_from_html_file(file_path, content_type, url=None):
         return extract_main_content_text(soup)
 
 def process_domain_files(domain_dir, domain_name, metadata_entry):
-    """Process all HTML files for a single domain."""
+    """Process all HTML files in a single domain directory (given as a path string)."""
     logger.info(f"Processing domain: {domain_name}")
     
     domain_data = {
@@ -214,6 +289,10 @@ def process_domain_files(domain_dir, domain_name, metadata_entry):
     }
     
     try:
+        # One directory read tells us which files exist, instead of a stat per candidate file
+        with os.scandir(domain_dir) as entries:
+            filenames = {entry.name for entry in entries if entry.is_file()}
+        
         # Process specific component files first
         component_files = {
             'navbar.html': 'navbar',
@@ -222,9 +301,9 @@ def process_domain_files(domain_dir, domain_name, metadata_entry):
         }
         
         for filename, content_type in component_files.items():
-            file_path = domain_dir / filename
-            if file_path.exists():
-                extracted_text = extract_from_html_file(file_path, content_type)
+            if filename in filenames:
+                file_path = os.path.join(domain_dir, filename)
+                extracted_text = extract_from_html_file(read_html_file(file_path, content_type), content_type)
                 domain_data[content_type] = extracted_text
                 domain_data['files_processed'].append(filename)
                 logger.info(f"Extracted {content_type} from {filename} for {domain_name}")
@@ -232,9 +311,9 @@ def process_domain_files(domain_dir, domain_name, metadata_entry):
                 logger.info(f"File {filename} not found for {domain_name}")
         
         # Look for case study file
-        case_study_file = domain_dir / 'case_study.html'
-        if case_study_file.exists():
-            extracted_text = extract_from_html_file(case_study_file, 'case_study')
+        if 'case_study.html' in filenames:
+            case_study_file = os.path.join(domain_dir, 'case_study.html')
+            extracted_text = extract_from_html_file(read_html_file(case_study_file, 'case_study'), 'case_study')
             domain_data['case_study'] = extracted_text
             domain_data['files_processed'].append('case_study.html')
             logger.info(f"Extracted case study from case_study.html for {domain_name}")
@@ -245,11 +324,12 @@ def process_domain_files(domain_dir, domain_name, metadata_entry):
                     if page_key.startswith('internal_') and is_case_study_url(page_info.get('url', '')):
                         # Find corresponding file
                         page_num = page_key.split('_')[1]
-                        internal_file = domain_dir / f'internal_page_{page_num}.html'
-                        if internal_file.exists():
-                            extracted_text = extract_from_html_file(internal_file, 'case_study', page_info.get('url'))
+                        internal_filename = f'internal_page_{page_num}.html'
+                        if internal_filename in filenames:
+                            internal_tree = read_html_file(os.path.join(domain_dir, internal_filename), 'case_study')
+                            extracted_text = extract_from_html_file(internal_tree, 'case_study', page_info.get('url'))
                             domain_data['case_study'] = extracted_text
-                            domain_data['files_processed'].append(f'internal_page_{page_num}.html')
+                            domain_data['files_processed'].append(internal_filename)
                             logger.info(f"Found case study in internal page {page_num} for {domain_name}")
                             break
         
@@ -268,6 +348,9 @@ def process_domain_files(domain_dir, domain_name, metadata_entry):
         logger.error(f"Error processing domain {domain_name}: {e}")
         domain_data['error'] = str(e)
         return domain_data
+    finally:
+        # Pool workers exit without running atexit hooks, so write this domain's log lines now
+        log_buffer.flush()
 
 def main():
     """Main extraction function."""
@@ -276,15 +359,12 @@ def main():
     
     # Load metadata to understand file structure
     metadata = load_metadata()
+    domain_index = build_domain_index(metadata)
     
-    extracted_data = {
-        'extraction_time': datetime.now().isoformat(),
-        'domains': {},
-        'summary': {
-            'total_domains': 0,
-            'successful_extractions': 0,
-            'failed_extractions': 0
-        }
+    summary = {
+        'total_domains': 0,
+        'successful_extractions': 0,
+        'failed_extractions': 0
     }
     
     try:
@@ -293,47 +373,45 @@ def main():
             logger.error(f"Raw data directory not found: {RAW_DATA_DIR}")
             return
         
-        for domain_dir in RAW_DATA_DIR.iterdir():
-            if domain_dir.is_dir():
-                domain_name = domain_dir.name
-                extracted_data['summary']['total_domains'] += 1
-                
-                # Get metadata for this domain if available
-                metadata_entry = None
-                for url, data in metadata.items():
-                    if data.get('domain') == domain_name:
-                        metadata_entry = data
-                        break
-                
-                # Process the domain
-                domain_data = process_domain_files(domain_dir, domain_name, metadata_entry)
-                extracted_data['domains'][domain_name] = domain_data
+        # DirEntry caches the file type from the directory read, so is_dir() needs no extra stat
+        with os.scandir(RAW_DATA_DIR) as entries:
+            domain_entries = [entry for entry in entries if entry.is_dir()]
+        domain_dirs = [entry.path for entry in domain_entries]
+        domain_names = [entry.name for entry in domain_entries]
+        summary['total_domains'] = len(domain_dirs)
+        
+        # Get metadata for each domain if available
+        metadata_entries = []
+        for domain_name in domain_names:
+            entry = domain_index.get(domain_name)
+            metadata_entries.append(entry[1] if entry else None)
+        
+        # Domains are independent, so parse them in parallel; map() keeps directory order.
+        # Each domain is written as soon as it is done, so no run holds every domain's text.
+        max_workers = max(1, min(MAX_WORKER_PROCESSES, len(domain_dirs)))
+        log_buffer.flush()  # forked workers would otherwise inherit and re-write pending records
+        with open(OUTPUT_FILE, 'wb', buffering=WRITE_BUFFER_SIZE) as f, \
+                ProcessPoolExecutor(max_workers=max_workers) as executor:
+            results = executor.map(process_domain_files, domain_dirs, domain_names, metadata_entries)
+            
+            for domain_data in results:
+                f.write(orjson.dumps(domain_data, option=orjson.OPT_APPEND_NEWLINE))
                 
                 if 'error' not in domain_data:
-                    extracted_data['summary']['successful_extractions'] += 1
+                    summary['successful_extractions'] += 1
                 else:
-                    extracted_data['summary']['failed_extractions'] += 1
-        
-        # Save extracted data
-        with open(OUTPUT_FILE, 'w', encoding='utf-8') as f:
-            json.dump(extracted_data, f, indent=2, ensure_ascii=False)
+                    summary['failed_extractions'] += 1
         
         logger.info(f"Extraction completed successfully!")
-        logger.info(f"Processed {extracted_data['summary']['total_domains']} domains")
-        logger.info(f"Successful: {extracted_data['summary']['successful_extractions']}")
-        logger.info(f"Failed: {extracted_data['summary']['failed_extractions']}")
+        logger.info(f"Processed {summary['total_domains']} domains")
+        logger.info(f"Successful: {summary['successful_extractions']}")
+        logger.info(f"Failed: {summary['failed_extractions']}")
         logger.info(f"Results saved to: {OUTPUT_FILE}")
         
     except Exception as e:
+        # Domains finished before the error are already in the output file
         logger.error(f"Unexpected error in main: {e}")
-        extracted_data['error'] = str(e)
-        
-        # Save partial results even if there was an error
-        try:
-            with open(OUTPUT_FILE, 'w', encoding='utf-8') as f:
-                json.dump(extracted_data, f, indent=2, ensure_ascii=False)
-        except Exception as save_error:
-            logger.error(f"Failed to save partial results: {save_error}")
+        logger.info(f"Partial results ({summary['successful_extractions'] + summary['failed_extractions']} domains) kept in {OUTPUT_FILE}")
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -0,0 +1,63 @@
+"""Setup and helpers shared by the pipeline scripts."""
+import atexit
+import logging
+import logging.handlers
+import orjson
+
+# Indented UTF-8 output; non-string dict keys are written as strings
+JSON_DUMP_OPTIONS = orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS
+READ_BUFFER_SIZE = 64 * 1024  # fewer read() syscalls than the 8KB default
+
+LOG_FORMAT = '%(asctime)s - %(levelname)s - %(message)s'
+LOG_BUFFER_CAPACITY = 1024  # records held in memory between writes to the log file
+
+class BufferedFileHandler(logging.handlers.MemoryHandler):
+    """Hold log records in memory and append each batch to the log file in one write.
+
+    A plain MemoryHandler replays its buffer through a FileHandler, which still flushes
+    after every record. Here the batch is formatted and written together. That happens
+    when the buffer is full, when a record at `flush_level` or above arrives, and on close.
+    """
+
+    def __init__(self, filename, capacity=LOG_BUFFER_CAPACITY, flush_level=logging.ERROR):
+        super().__init__(capacity, flushLevel=flush_level)
+        self.filename = filename
+
+    def flush(self):
+        with self.lock:
+            if not self.buffer:
+                return
+            try:
+                text = ''.join(self.format(record) + '\n' for record in self.buffer)
+                with open(self.filename, 'a', encoding='utf-8') as f:
+                    f.write(text)
+            except Exception:
+                self.handleError(self.buffer[-1])
+            self.buffer.clear()
+
+def setup_logging(log_file):
+    """Log to `log_file` through a write buffer and to the console unbuffered.
+
+    Returns the file handler so callers can flush it at points where the process may be
+    forked or may exit without running atexit hooks (e.g. pool workers).
+    """
+    file_handler = BufferedFileHandler(log_file)
+    logging.basicConfig(
+        level=logging.INFO,
+        format=LOG_FORMAT,
+        handlers=[
+            file_handler,
+            logging.StreamHandler()
+        ]
+    )
+    atexit.register(file_handler.flush)
+    return file_handler
+
+def build_domain_index(metadata):
+    """Map each domain to its (url, metadata entry); the first URL seen for a domain wins."""
+    domain_index = {}
+    for url, data in metadata.items():
+        domain = data.get('domain')
+        if domain and domain not in domain_index:
+            domain_index[domain] = (url, data)
+    return domain_index
@@ -1,28 +1,28 @@
 import os
-import json
 import logging
 from pathlib import Path
 from datetime import datetime
+from collections import Counter
 from urllib.parse import urlparse
+import orjson
+from pipeline_utils import setup_logging, build_domain_index, JSON_DUMP_OPTIONS, READ_BUFFER_SIZE
 
 # Configuration
 BASE_DIR = Path(__file__).resolve().parent.parent
 DATA_DIR = BASE_DIR / "data"
 PROCESSED_DIR = DATA_DIR / "processed"
-EXTRACTED_FILE = PROCESSED_DIR / "extracted.json"
+EXTRACTED_FILE = PROCESSED_DIR / "extracted.jsonl"  # one JSON object per domain per line
 STANDARDIZED_FILE = PROCESSED_DIR / "standardized.json"
 METADATA_FILE = DATA_DIR / "metadata.json"
 LOG_FILE = BASE_DIR / "transformer.log"
 
-# Logging setup
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler(LOG_FILE),
-        logging.StreamHandler()
-    ]
-)
+# Standardized record schema
+SECTIONS = ('navbar', 'homepage', 'footer', 'case_study')
+VALID_SECTIONS = frozenset(SECTIONS)
+REQUIRED_FIELDS = ('website', 'section', 'content', 'crawl_timestamp', 'isActive')
+
+# Logging setup; file output is batched in memory and written out on ERROR or exit
+log_buffer = setup_logging(LOG_FILE)
 logger = logging.getLogger(__name__)
 
 def setup_directories():
@@ -30,18 +30,16 @@ def setup_directories():
     PROCESSED_DIR.mkdir(parents=True, exist_ok=True)
     logger.info(f"Processed directory ready at {PROCESSED_DIR}")
 
-def load_extracted_data():
-    """Load extracted text data."""
-    if not EXTRACTED_FILE.exists():
-        logger.error(f"Extracted data file not found: {EXTRACTED_FILE}")
-        return None
-    
-    try:
-        with open(EXTRACTED_FILE, 'r', encoding='utf-8') as f:
-            return json.load(f)
-    except (json.JSONDecodeError, IOError) as e:
-        logger.error(f"Error loading extracted data: {e}")
-        return None
+def iter_extracted_domains():
+    """Stream extracted domain data from disk one line at a time."""
+    with open(EXTRACTED_FILE, 'rb', buffering=READ_BUFFER_SIZE) as f:
+        for line in f:
+            if not line.strip():
+                continue
+            try:
+                yield orjson.loads(line)
+            except orjson.JSONDecodeError as e:
+                logger.error(f"Skipping corrupt extracted data line: {e}")
 
 def load_metadata():
     """Load crawler metadata to get original URLs and timestamps."""
@@ -50,32 +48,19 @@ def load_metadata():
         return {}
     
     try:
-        with open(METADATA_FILE, 'r', encoding='utf-8') as f:
-            return json.load(f)
-    except (json.JSONDecodeError, IOError) as e:
+        with open(METADATA_FILE, 'rb', buffering=READ_BUFFER_SIZE) as f:
+            return orjson.loads(f.read())
+    except (orjson.JSONDecodeError, IOError) as e:
         logger.error(f"Error loading metadata: {e}")
         return {}
 
-def find_website_url_by_domain(domain, metadata):
-    """Find the original website URL for a given domain."""
-    for url, data in metadata.items():
-        if data.get('domain') == domain:
-            return url
-    
-    # Fallback: construct URL from domain
+def default_website_url(domain):
+    """Construct a website URL for a domain missing from the metadata."""
     if domain:
         return f"https://www.{domain}" if not domain.startswith('www.') else f"https://{domain}"
     
     return ""
 
-def get_crawl_timestamp(domain, metadata):
-    """Get the crawl timestamp for a domain."""
-    for url, data in metadata.items():
-        if data.get('domain') == domain:
-            return data.get('crawl_time', '')
-    
-    return ""
-
 def create_standardized_record(website_url, section, content, crawl_timestamp):
     """Create a standardized record."""
     return {
@@ -86,20 +71,25 @@ def create_standardized_record(website_url, section, content, crawl_timestamp):
         "isActive": True
     }
 
-def transform_domain_data(domain_name, domain_data, metadata):
+def transform_domain_data(domain_name, domain_data, domain_index):
     """Transform data for a single domain into standardized records."""
     records = []
     
     # Get website URL and crawl timestamp
-    website_url = find_website_url_by_domain(domain_name, metadata)
-    crawl_timestamp = get_crawl_timestamp(domain_name, metadata)
+    entry = domain_index.get(domain_name)
+    if entry:
+        website_url, data = entry
+        crawl_timestamp = data.get('crawl_time', '')
+    else:
+        website_url = default_website_url(domain_name)
+        crawl_timestamp = ""
     
     logger.info(f"Transforming domain: {domain_name} -> {website_url}")
     
-    # Define sections to process
-    sections = ['navbar', 'homepage', 'footer', 'case_study']
+    # Per-section statistics cost a format call each, so only build them when they will be shown
+    log_sections = logger.isEnabledFor(logging.DEBUG)
     
-    for section in sections:
+    for section in SECTIONS:
         content = domain_data.get(section, "")
         
         # Create record even if content is empty (as per requirements)
@@ -113,26 +103,42 @@ def transform_domain_data(domain_name, domain_data, metadata):
         records.append(record)
         
         # Log content statistics
-        content_length = len(content) if content else 0
-        if content_length > 0:
-            logger.info(f"  {section}: {content_length} characters")
-        else:
-            logger.info(f"  {section}: empty content")
+        if log_sections:
+            content_length = len(content) if content else 0
+            if content_length > 0:
+                logger.debug(f"  {section}: {content_length} characters")
+            else:
+                logger.debug(f"  {section}: empty content")
     
     return records
 
+def validate_domain_data(domain_data):
+    """Validate one extracted domain before it is turned into records."""
+    if not isinstance(domain_data, dict):
+        logger.error(f"Extracted domain data must be an object, got: {type(domain_data)}")
+        return False
+    
+    for section in SECTIONS:
+        content = domain_data.get(section)
+        if content is not None and not isinstance(content, str):
+            logger.error(f"Section {section} of {domain_data.get('domain')} must be text, got: {type(content)}")
+            return False
+    
+    return True
+
 def validate_record(record):
-    """Validate a standardized record."""
-    required_fields = ['website', 'section', 'content', 'crawl_timestamp', 'isActive']
+    """Validate a standardized record.
     
-    for field in required_fields:
+    Not called by main(): records built from validated domain data have these fields
+    and types by construction. Kept for checking records produced elsewhere.
+    """
+    for field in REQUIRED_FIELDS:
         if field not in record:
             logger.error(f"Missing required field: {field}")
             return False
     
     # Validate section values
-    valid_sections = ['navbar', 'homepage', 'footer', 'case_study']
-    if record['section'] not in valid_sections:
+    if record['section'] not in VALID_SECTIONS:
         logger.error(f"Invalid section: {record['section']}")
         return False
     
@@ -143,18 +149,24 @@ def validate_record(record):
     
     return True
 
+def summarize_records(standardized_data, section_counts):
+    """Fill in the record totals of the summary from the collected records."""
+    summary = standardized_data['summary']
+    summary['total_records'] = len(standardized_data['records'])
+    summary['records_by_section'].update(section_counts)
+
 def main():
     """Main transformation function."""
     logger.info("Starting data transformation to standardized format...")
     setup_directories()
     
-    # Load input data
-    extracted_data = load_extracted_data()
-    if not extracted_data:
-        logger.error("Failed to load extracted data. Exiting.")
+    # Input data is streamed domain by domain below
+    if not EXTRACTED_FILE.exists():
+        logger.error(f"Extracted data file not found: {EXTRACTED_FILE}. Exiting.")
         return
     
     metadata = load_metadata()
+    domain_index = build_domain_index(metadata)
     
     # Initialize output structure
     standardized_data = {
@@ -175,32 +187,34 @@ def main():
         }
     }
     
+    records = standardized_data['records']
+    section_counts = Counter()
+    
     try:
-        domains_data = extracted_data.get('domains', {})
-        standardized_data['summary']['total_domains'] = len(domains_data)
-        
         # Process each domain
-        for domain_name, domain_data in domains_data.items():
+        for domain_data in iter_extracted_domains():
+            standardized_data['summary']['total_domains'] += 1
+            
+            # Validate the inputs once per domain; the records built from them are valid by construction
+            if not validate_domain_data(domain_data):
+                standardized_data['summary']['validation_errors'] += len(SECTIONS)
+                continue
+            
+            domain_name = domain_data.get('domain', '')
             logger.info(f"Processing domain: {domain_name}")
             
             # Transform domain data to standardized records
-            domain_records = transform_domain_data(domain_name, domain_data, metadata)
+            domain_records = transform_domain_data(domain_name, domain_data, domain_index)
             
-            # Validate and add records
-            for record in domain_records:
-                if validate_record(record):
-                    standardized_data['records'].append(record)
-                    standardized_data['summary']['total_records'] += 1
-                    standardized_data['summary']['records_by_section'][record['section']] += 1
-                else:
-                    standardized_data['summary']['validation_errors'] += 1
-                    logger.error(f"Validation failed for record: {record}")
+            # Add records; totals are filled in once from these before saving
+            records.extend(domain_records)
+            section_counts.update(record['section'] for record in domain_records)
             
             standardized_data['summary']['domains_processed'].append(domain_name)
         
         # Save standardized data
-        with open(STANDARDIZED_FILE, 'w', encoding='utf-8') as f:
-            json.dump(standardized_data, f, indent=2, ensure_ascii=False)
+        summarize_records(standardized_data, section_counts)
+        STANDARDIZED_FILE.write_bytes(orjson.dumps(standardized_data, option=JSON_DUMP_OPTIONS))
         
         # Log summary
         summary = standardized_data['summary']
@@ -227,9 +241,9 @@ def main():
         
         # Save partial results with error information
         standardized_data['error'] = str(e)
+        summarize_records(standardized_data, section_counts)
         try:
-            with open(STANDARDIZED_FILE, 'w', encoding='utf-8') as f:
-                json.dump(standardized_data, f, indent=2, ensure_ascii=False)
+            STANDARDIZED_FILE.write_bytes(orjson.dumps(standardized_data, option=JSON_DUMP_OPTIONS))
             logger.info("Partial results saved despite error")
         except Exception as save_error:
             logger.error(f"Failed to save partial results: {save_error}")
@@ -0,0 +1,36 @@
+"""Regression tests for scripts/aggregator.py."""
+import sys
+from pathlib import Path
+
+import orjson
+
+sys.path.insert(0, str(Path(__file__).resolve().parent / "scripts"))
+import aggregator  # noqa: E402
+
+STANDARDIZED_DATA = {
+    'records': [
+        {'website': 'https://example.com', 'section': 'homepage', 'content': 'Welcome',
+         'isActive': True, 'crawl_timestamp': '2024-01-01T00:00:00'},
+    ],
+    'summary': {'total_records': 1, 'fill_rate': 100.0},
+}
+
+def run_main(tmp_path, monkeypatch, content):
+    standardized_file = tmp_path / 'standardized.json'
+    standardized_file.write_bytes(content)
+    monkeypatch.setattr(aggregator, 'STANDARDIZED_FILE', standardized_file)
+    monkeypatch.setattr(aggregator, 'METRICS_FILE', tmp_path / 'metrics.json')
+    monkeypatch.setattr(aggregator, 'AGGREGATED_DIR', tmp_path)
+    monkeypatch.setattr(aggregator, 'BASE_DIR', tmp_path)
+    monkeypatch.setattr(aggregator.log_buffer, 'filename', tmp_path / 'aggregator.log')
+    aggregator.main()
+    return tmp_path / 'metrics.json'
+
+def test_truncated_input_writes_no_metrics(tmp_path, monkeypatch):
+    content = orjson.dumps(STANDARDIZED_DATA)
+    metrics_file = run_main(tmp_path, monkeypatch, content[:len(content) // 2])
+    assert not metrics_file.exists()
+
+def test_input_summary_is_copied_to_metrics(tmp_path, monkeypatch):
+    metrics_file = run_main(tmp_path, monkeypatch, orjson.dumps(STANDARDIZED_DATA))
+    assert orjson.loads(metrics_file.read_bytes())['input_summary'] == STANDARDIZED_DATA['summary']
@@ -0,0 +1,46 @@
+"""Regression tests for scripts/crawler.py."""
+import sys
+from pathlib import Path
+
+import pytest
+import lxml.html
+
+sys.path.insert(0, str(Path(__file__).resolve().parent / "scripts"))
+import crawler  # noqa: E402
+
+BASE_URL = 'https://example.com/'
+
+LINK_CASES = [
+    # A URL taken as an internal link that later becomes the case study frees its slot for /blog
+    ('<a href="/pricing">Pricing</a><a href="/docs">Docs</a><a href="/blog">Blog</a>'
+     '<a href="/pricing">Customer stories</a>',
+     ('https://example.com/pricing', ['https://example.com/docs', 'https://example.com/blog'])),
+    # Internal links keep document order around the case study
+    ('<a href="/c">C</a><a href="/Customer">Customers</a><a href="/d">D</a>',
+     ('https://example.com/Customer', ['https://example.com/c', 'https://example.com/d'])),
+    # Different hrefs resolving to the same URL count once
+    ('<a href="/a">A</a><a href="a">A again</a><a href="/case-studies">Work</a><a href="/b">B</a>',
+     ('https://example.com/case-studies', ['https://example.com/a', 'https://example.com/b'])),
+    # Homepage, binary files and other hosts are never internal links
+    ('<a href="/">Home</a><a href="/brochure.pdf">PDF</a><a href="https://other.com/x">X</a><a href="/about">About</a>',
+     (None, ['https://example.com/about'])),
+]
+
+@pytest.mark.parametrize("anchors, expected", LINK_CASES)
+def test_extract_links(anchors, expected):
+    tree = lxml.html.fromstring(f'<html><body><p>Intro</p>{anchors}</body></html>')
+    assert crawler.extract_links(BASE_URL, tree) == expected
+
+@pytest.mark.parametrize("encoding, text", [
+    ('utf-8', 'café'),
+    ('latin-1', 'café'),
+    ('mac-roman', 'café'),
+    ('euc_jp', '日本語'),
+    ('iso2022_jp', '日本語'),
+])
+def test_parse_html_accepts_python_codec_names(encoding, text):
+    # aiohttp reports Python codec names, some of which libxml2 does not recognise
+    content = f'<html><body><nav><a href="/x">{text}</a></nav></body></html>'.encode(encoding)
+    tree = crawler.parse_html(content, encoding)
+    assert tree is not None
+    assert tree.xpath('string(//nav/a)') == text
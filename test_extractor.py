@@ -0,0 +1,24 @@
+"""Regression tests for scripts/extractor.py."""
+import sys
+from pathlib import Path
+
+import pytest
+from bs4 import BeautifulSoup
+
+sys.path.insert(0, str(Path(__file__).resolve().parent / "scripts"))
+import extractor  # noqa: E402
+
+pytestmark = pytest.mark.skipif(extractor.LexborHTMLParser is None, reason="selectolax not installed")
+
+BODY_FALLBACK_PAGES = [
+    '<html><body class="has-navbar"><div>Hello <nav>N</nav> world</div><footer>F</footer></body></html>',
+    '<html><body class="nav-open"><header>H</header><p>Main <span class="sidebar">S</span>text</p></body></html>',
+    '<html><body><div class="nav"><nav class="footer">X</nav></div><p>Kept</p><script>s()</script></body></html>',
+]
+
+@pytest.mark.parametrize("html", BODY_FALLBACK_PAGES)
+def test_body_fallback_matches_between_backends(html):
+    lexbor_text = extractor.extract_main_content_text(extractor.LexborHTMLParser(html))
+    soup_text = extractor.extract_main_content_text(BeautifulSoup(html, extractor.HTML_PARSER))
+    assert lexbor_text == soup_text
+    assert lexbor_text